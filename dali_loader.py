@@ -0,0 +1,168 @@
+"""
+Module: dali_loader.py
+
+Optional NVIDIA DALI input pipeline for the preprocessed video clips.
+
+When DALI is installed and a GPU is available, the per-frame resize /
+to-float / normalize work that the torchvision transform chain performs on
+CPU is moved to the GPU: batches of raw uint8 clips are streamed into a DALI
+pipeline through an external source, DALI resizes the frames and fuses the
+uint8 -> float conversion with normalization into a single GPU kernel
+(crop_mirror_normalize), and the results come back as CUDA tensors ready for
+the model.
+
+DALI is an optional dependency. Callers should check DALI_AVAILABLE and fall
+back to the regular PyTorch DataLoaders from utils.py when it is False.
+
+Note: the DALI path applies random horizontal flipping for training but does
+not replicate the random-translate augmentation of the torchvision chain.
+"""
+
+import random
+
+import numpy as np
+
+try:
+    from nvidia.dali import fn, pipeline_def, types
+    from nvidia.dali.plugin.pytorch import DALIGenericIterator
+    DALI_AVAILABLE = True
+except ImportError:
+    DALI_AVAILABLE = False
+
+
+def _load_clip(vid_path, fr_per_vid):
+    """Load a preprocessed clip as a contiguous (T, H, W, 3) uint8 array."""
+    return np.asarray(np.load(vid_path, mmap_mode='r')[:fr_per_vid])
+
+
+class _ClipSource:
+    """
+    Batch source feeding raw uint8 clips into fn.external_source.
+
+    Reading the .npy clips is a cheap sequential copy (no decode), so the
+    Python side stays light; everything pixel-heavy runs in the GPU pipeline.
+
+    Args:
+        samples (list): List of (clip_path, label) tuples.
+        batch_size (int): Number of clips per batch.
+        fr_per_vid (int): Number of frames per clip to load.
+        shuffle (bool): Whether to reshuffle the sample order every epoch.
+    """
+    def __init__(self, samples, batch_size, fr_per_vid, shuffle):
+        self.samples = list(samples)
+        self.batch_size = batch_size
+        self.fpv = fr_per_vid
+        self.shuffle = shuffle
+        self.order = list(range(len(self.samples)))
+        self.i = 0
+
+    def __len__(self):
+        """Return the number of batches per epoch."""
+        return (len(self.samples) + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self):
+        if self.shuffle:
+            random.shuffle(self.order)
+        self.i = 0
+        return self
+
+    def __next__(self):
+        if self.i >= len(self.samples):
+            raise StopIteration
+        chunk = self.order[self.i:self.i + self.batch_size]
+        self.i += self.batch_size
+        clips = [_load_clip(self.samples[k][0], self.fpv) for k in chunk]
+        labels = [np.array([self.samples[k][1]], dtype=np.int64) for k in chunk]
+        return clips, labels
+
+
+if DALI_AVAILABLE:
+    @pipeline_def
+    def _clip_pipeline(source, h, w, mean, std, augment):
+        """
+        DALI pipeline: uint8 clips in, normalized float (T, C, H, W) clips out.
+
+        Resize runs per frame on the 'FHWC' sequence layout, and
+        crop_mirror_normalize fuses the uint8 -> float32 conversion, the
+        normalization, and (for training) random horizontal mirroring.
+        """
+        clips, labels = fn.external_source(source=source, num_outputs=2,
+                                           layout=['FHWC', ''],
+                                           dtype=[types.UINT8, types.INT64],
+                                           cycle='raise')
+        clips = fn.resize(clips.gpu(), size=[h, w])
+        mirror = fn.random.coin_flip(probability=0.5) if augment else 0
+        clips = fn.crop_mirror_normalize(clips, dtype=types.FLOAT,
+                                         output_layout='FCHW', mirror=mirror,
+                                         mean=[m * 255 for m in mean],
+                                         std=[s * 255 for s in std])
+        return clips, labels
+
+
+class DALIClipLoader:
+    """
+    DataLoader-compatible wrapper around the DALI clip pipeline.
+
+    Iterating yields (clips, labels) batches like the PyTorch DataLoaders in
+    utils.py, with clips already resident on the GPU. The underlying sample
+    list is exposed as `dataset` so epoch-level accounting in train.py
+    (len(dataloader.dataset)) keeps working.
+
+    Args:
+        samples (list): List of (clip_path, label) tuples.
+        batch_size (int): Number of clips per batch.
+        fr_per_vid (int): Number of frames per clip.
+        h (int): Target frame height.
+        w (int): Target frame width.
+        mean (list): Per-channel normalization means (0-1 range).
+        std (list): Per-channel normalization stds (0-1 range).
+        shuffle (bool): Reshuffle samples every epoch and enable mirroring.
+        num_threads (int): DALI pipeline worker threads.
+        device_id (int): CUDA device the pipeline runs on.
+    """
+    def __init__(self, samples, batch_size, fr_per_vid, h, w, mean, std,
+                 shuffle=False, num_threads=4, device_id=0):
+        self.dataset = list(samples)
+        self._source = _ClipSource(self.dataset, batch_size, fr_per_vid, shuffle)
+        pipe = _clip_pipeline(source=self._source, h=h, w=w, mean=mean, std=std,
+                              augment=shuffle, batch_size=batch_size,
+                              num_threads=num_threads, device_id=device_id)
+        pipe.build()
+        self._iterator = DALIGenericIterator(pipe, ['clips', 'labels'],
+                                             auto_reset=True)
+
+    def __len__(self):
+        """Return the number of batches per epoch."""
+        return len(self._source)
+
+    def __iter__(self):
+        for batch in self._iterator:
+            data = batch[0]
+            yield data['clips'], data['labels'].squeeze(-1)
+
+
+def dali_train_val_dloaders(tr_split, val_split, batch_size, fr_per_vid, h, w, mean, std):
+    """
+    Create DALI-backed loaders for the training and validation splits.
+
+    Mirrors utils.train_val_dloaders (same dict shape, same 2x validation
+    batch size) so the two paths are interchangeable in run.py.
+
+    Args:
+        tr_split (list): List of (clip_path, label) tuples for training.
+        val_split (list): List of (clip_path, label) tuples for validation.
+        batch_size (int): Number of clips per training batch.
+        fr_per_vid (int): Number of frames per clip.
+        h (int): Target frame height.
+        w (int): Target frame width.
+        mean (list): Per-channel normalization means.
+        std (list): Per-channel normalization stds.
+
+    Returns:
+        dict: Dictionary with keys 'train' and 'val' mapping to DALIClipLoaders.
+    """
+    train_dl = DALIClipLoader(tr_split, batch_size, fr_per_vid, h, w, mean, std,
+                              shuffle=True)
+    val_dl = DALIClipLoader(val_split, 2 * batch_size, fr_per_vid, h, w, mean, std,
+                            shuffle=False)
+    return {'train': train_dl, 'val': val_dl}
@@ -1,55 +1,100 @@
-"""
-Instructions: 
-
-Before training, the raw video files must be converted into frame sequences.
-
-The following module performs the following tasks:
-1. Use OpenCV to uniformly sample frames from the video files, using the `get_frames` function.
-2. Write the extracted frames as JPEG images to the specified directory using the `store_frames` function.
-          store_path (str): Directory path where the frames will be saved.
-"""
-import os
-import cv2
-import numpy as np
-
-from torchvision import transforms as transforms
-from torch.utils.data import DataLoader
-from video_datasets import collate_fn_r3d_18, collate_fn_rnn
-
-from utils import get_frames, store_frames  # Main functions to be used in the script
-
-
-root = os.path.dirname(os.path.abspath(__file__))  # Get the directory of the current file
-video_dir = os.path.join(root, "UCF50_video")  # Directory containing video files
-store_path = os.path.join(root, "UCF50")  # Directory to store the frames
-
-def preprocess_video(store_path):
-    """
-    Preprocess video files by extracting frames and saving them as JPEG images.
-    
-    This function iterates through all video files in the specified directory,
-    extracts frames using OpenCV, and saves them to a designated directory.
-    """
-    # video_dir = "video_action\UCF50_videos"  # Directory containing video files
-    root = os.path.dirname(os.path.abspath(__file__))  # Get the directory of the current file
-    video_dir = os.path.join(root, "UCF50_video")  # Directory containing video files
-    if not os.path.exists(store_path):
-        os.makedirs(store_path)  # Create the directory if it doesn't exist
-
-    for dir in os.listdir(video_dir):
-        # Iterate through all folders
-        print(dir)
-        for filename in os.listdir(os.path.join(video_dir, dir)):
-            if filename.endswith(".avi"):
-                print(filename)
-                vid_path = os.path.join(video_dir, dir, filename)
-                frames, v_len = get_frames(vid_path, n_frames=16)  # Extract 16 frames from the video
-                store_path_spec = os.path.join(store_path, dir, filename.split('.')[0])
-                os.makedirs(store_path_spec, exist_ok=True)
-                store_frames(frames, store_path_spec)  # Save the extracted frames as JPEG images
-
-# Make callable
-if __name__ == "__main__":
-    store_path = os.path.join(root, "UCF50")  # Directory to store the frames
-    preprocess_video(store_path)  # Call the preprocessing function to start the process
-    print(f"Frames extracted and stored in {store_path}")
\ No newline at end of file
+"""
+Instructions:
+
+Before training, the raw video files must be converted into frame sequences.
+
+The following module performs the following tasks:
+1. Use OpenCV to uniformly sample frames from the video files, using the `get_frames` function.
+2. Write the extracted frames as a single uint8 .npy tensor per video using the
+   `store_clip` function.
+          store_path (str): Directory path where the clips will be saved.
+
+Videos are independent of each other, so the per-video work is dispatched to a
+multiprocessing.Pool sized to the machine's core count.
+"""
+import os
+import cv2
+import json
+import multiprocessing as mp
+
+from utils import get_frames, store_clip  # Main functions to be used in the script
+
+
+root = os.path.dirname(os.path.abspath(__file__))  # Get the directory of the current file
+video_dir = os.path.join(root, "UCF50_video")  # Directory containing video files
+store_path = os.path.join(root, "UCF50")  # Directory to store the frames
+
+
+def _process_one(task):
+    """
+    Extract and store the frames for a single video.
+
+    Runs inside a pool worker. OpenCV's internal threading is disabled so the
+    workers don't oversubscribe the cores the pool already occupies.
+
+    Args:
+        task (tuple): (vid_path, store_path_spec) pair, where vid_path is the
+            source video file and store_path_spec the output clip path
+            (store_clip appends the .npy extension).
+    """
+    vid_path, store_path_spec = task
+    cv2.setNumThreads(1)
+    print(os.path.basename(vid_path))
+    # Extract 16 frames, downscaled near the model's 224x224 input so the
+    # stored tensors stay small. One decoder thread per worker: the pool
+    # already occupies every core.
+    frames, v_len = get_frames(vid_path, n_frames=16, size=(256, 256), thread_count=1)
+    os.makedirs(os.path.dirname(store_path_spec), exist_ok=True)
+    store_clip(frames, store_path_spec)  # Save the clip as a single uint8 .npy tensor
+
+
+def preprocess_video(store_path):
+    """
+    Preprocess video files by extracting frames and saving each video's clip
+    as a single uint8 .npy tensor.
+
+    This function iterates through all video files in the specified directory,
+    extracts frames using OpenCV, and saves them to a designated directory.
+    The per-video work is independent and CPU-bound on decode, so it is fanned
+    out over a process pool (one worker per core).
+    """
+    # video_dir = "video_action\UCF50_videos"  # Directory containing video files
+    root = os.path.dirname(os.path.abspath(__file__))  # Get the directory of the current file
+    video_dir = os.path.join(root, "UCF50_video")  # Directory containing video files
+    if not os.path.exists(store_path):
+        os.makedirs(store_path)  # Create the directory if it doesn't exist
+
+    # Enumerate all videos up front (cheap), then dispatch to the pool.
+    # scandir yields DirEntry objects with cached type info, so no extra
+    # stat calls or path re-joining per file.
+    tasks = []
+    class_names = []
+    with os.scandir(video_dir) as class_it:
+        for cls_entry in class_it:
+            # Iterate through all folders
+            if not cls_entry.is_dir():
+                continue
+            print(cls_entry.name)
+            class_names.append(cls_entry.name)
+            with os.scandir(cls_entry.path) as vid_it:
+                for vid_entry in vid_it:
+                    if vid_entry.name.endswith(".avi"):
+                        store_path_spec = os.path.join(store_path, cls_entry.name,
+                                                       vid_entry.name.split('.')[0])
+                        tasks.append((vid_entry.path, store_path_spec))
+
+    with mp.Pool(processes=os.cpu_count()) as pool:
+        # imap_unordered streams results back as workers finish
+        for _ in pool.imap_unordered(_process_one, tasks, chunksize=8):
+            pass
+
+    # Persist the class list (sorted, matching load_dataset's label ordering)
+    # so evaluation doesn't depend on filesystem iteration order.
+    with open(os.path.join(root, 'classes.json'), 'w') as f:
+        json.dump(sorted(class_names), f)
+
+# Make callable
+if __name__ == "__main__":
+    store_path = os.path.join(root, "UCF50")  # Directory to store the frames
+    preprocess_video(store_path)  # Call the preprocessing function to start the process
+    print(f"Frames extracted and stored in {store_path}")
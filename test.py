@@ -8,11 +8,14 @@ and compute a multilabel confusion matrix for all classes.
 Functions:
     - test: Evaluates the model on a test DataLoader and returns the ground truth labels,
       predicted labels, and overall accuracy.
+    - compute_confusion_matrix: Accumulates a confusion matrix in one pass over the predictions.
+    - confusion_matrix_metrics: Derives precision/recall/F1 per class from a confusion matrix.
     - get_test_report: Generates a classification report using scikit-learn's classification_report.
     - get_confusion_matrix: Computes a multilabel confusion matrix for each class.
 """
 
 import torch
+import numpy as np
 from tqdm import tqdm
 from sklearn.metrics import classification_report, multilabel_confusion_matrix
 
@@ -54,6 +57,59 @@ def test(model, dataloader, device):
     
     return targets, outputs, accuracy
 
+def compute_confusion_matrix(targets, outputs, n_classes):
+    """
+    Build an (n_classes, n_classes) confusion matrix in a single pass.
+
+    Rows are ground-truth classes, columns are predicted classes. Using
+    np.add.at makes this one O(N) scatter over the label pairs instead of
+    the repeated full-array scans the sklearn report helpers perform.
+
+    Args:
+        targets (list): Ground truth numeric labels.
+        outputs (list): Predicted numeric labels.
+        n_classes (int): Number of classes.
+
+    Returns:
+        np.ndarray: Confusion matrix of counts with shape (n_classes, n_classes).
+    """
+    cm = np.zeros((n_classes, n_classes), dtype=np.int64)
+    np.add.at(cm, (np.asarray(targets), np.asarray(outputs)), 1)
+    return cm
+
+def confusion_matrix_metrics(cm, target_names):
+    """
+    Derive per-class precision, recall, F1-score, and support from a confusion matrix.
+
+    All metrics come from the already-accumulated counts, so no further pass
+    over the predictions is needed. Classes with no predictions or no samples
+    get zeros instead of NaNs.
+
+    Args:
+        cm (np.ndarray): Confusion matrix of counts (rows: truth, columns: prediction).
+        target_names (list): Class names, in label order.
+
+    Returns:
+        dict: Mapping of class name to its metrics, plus an 'accuracy' entry.
+
+    Raises:
+        ValueError: If the number of class names does not match the matrix size.
+    """
+    if len(target_names) != cm.shape[0]:
+        raise ValueError('Got {} class names for a {}-class confusion matrix — '
+                         'is classes.json stale?'.format(len(target_names), cm.shape[0]))
+    diag = np.diag(cm).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.nan_to_num(diag / cm.sum(axis=0))
+        recall = np.nan_to_num(diag / cm.sum(axis=1))
+        f1 = np.nan_to_num(2 * precision * recall / (precision + recall))
+    support = cm.sum(axis=1)
+    report = {name: {'precision': float(p), 'recall': float(r),
+                     'f1-score': float(f), 'support': int(s)}
+              for name, p, r, f, s in zip(target_names, precision, recall, f1, support)}
+    report['accuracy'] = float(diag.sum() / max(cm.sum(), 1))
+    return report
+
 def get_test_report(target, output, target_names):
     """
     Generate a detailed classification report based on test results.
@@ -18,8 +18,9 @@ import os
 import copy
 from tqdm import tqdm
 import torch
+from torch.optim.lr_scheduler import ReduceLROnPlateau
 
-def train(dataloaders, model, criterion, optimizer, scheduler, device, optim_model_wts_dir, n_epochs=30):
+def train(dataloaders, model, criterion, optimizer, scheduler, device, optim_model_wts_dir, n_epochs=30, amp_dtype=None):
     """
     Train and validate the model over a given number of epochs.
     
@@ -33,10 +34,15 @@ def train(dataloaders, model, criterion, optimizer, scheduler, device, optim_mod
         model (torch.nn.Module): The video classification model to be trained.
         criterion (callable): Loss function.
         optimizer (torch.optim.Optimizer): Optimizer for updating model weights.
-        scheduler (torch.optim.lr_scheduler): Learning rate scheduler, which adjusts the learning rate based on validation loss.
+        scheduler (torch.optim.lr_scheduler): Learning rate scheduler. ReduceLROnPlateau
+            is stepped once per epoch on the validation loss; any other scheduler
+            (e.g. warmup + cosine) is stepped once per training iteration.
         device (torch.device): Device (CPU or GPU) on which to perform training.
         optim_model_wts_dir (str): Directory to save the best model weights.
         n_epochs (int, optional): Number of training epochs. Default is 30.
+        amp_dtype (torch.dtype, optional): Autocast dtype for mixed-precision
+            training (torch.bfloat16 or torch.float16). None disables autocast.
+            A GradScaler is used automatically for float16.
 
     Returns:
         tuple: (model, loss_hist, acc_hist)
@@ -50,35 +56,50 @@ def train(dataloaders, model, criterion, optimizer, scheduler, device, optim_mod
     best_model_wts = copy.deepcopy(model.state_dict())
     best_val_acc = 0.0
 
+    # Gradient scaling is only needed for fp16; bf16 has enough exponent range.
+    scaler = torch.cuda.amp.GradScaler(enabled=(amp_dtype == torch.float16))
+
+    # Plateau schedulers are driven by the validation loss once per epoch;
+    # everything else (warmup + cosine) is stepped per training iteration.
+    per_iter_scheduler = None if isinstance(scheduler, ReduceLROnPlateau) else scheduler
+
     for epoch in range(n_epochs):
         current_lr = get_learning_rate(optimizer)
         print('Epoch {}/{}; Current learning rate {}'.format(epoch+1, n_epochs, current_lr))
 
         # Training phase
         model.train()
-        train_loss, train_accuracy = get_epoch_loss(model, criterion, dataloaders['train'], device, optimizer)
+        train_loss, train_accuracy = get_epoch_loss(model, criterion, dataloaders['train'], device, optimizer,
+                                                    amp_dtype=amp_dtype, scaler=scaler,
+                                                    scheduler=per_iter_scheduler)
         loss_hist['train'].append(train_loss)
         acc_hist['train'].append(train_accuracy)
 
         # Validation phase
         model.eval()
         with torch.no_grad():
-            val_loss, val_accuracy = get_epoch_loss(model, criterion, dataloaders['val'], device)
+            val_loss, val_accuracy = get_epoch_loss(model, criterion, dataloaders['val'], device,
+                                                    amp_dtype=amp_dtype)
         if val_accuracy > best_val_acc:
             best_val_acc = val_accuracy
             best_model_wts = copy.deepcopy(model.state_dict())
             best_model_name = 'best_model_wts.pt'
             best_model_path = os.path.join(optim_model_wts_dir, best_model_name)
-            torch.save(best_model_wts, best_model_path)
+            # Save the unwrapped weights: torch.compile prefixes state-dict
+            # keys with _orig_mod., which would tie the checkpoint to
+            # compiled (i.e. GPU) environments.
+            torch.save(getattr(model, '_orig_mod', model).state_dict(), best_model_path)
             print('Best model weights are updated at epoch {}!'.format(epoch+1))
         loss_hist['val'].append(val_loss)
         acc_hist['val'].append(val_accuracy)
 
-        # Update learning rate based on validation loss
-        scheduler.step(val_loss)
-        if current_lr != get_learning_rate(optimizer):
-            print('Loading best model weights!')
-            model.load_state_dict(best_model_wts)
+        # Plateau schedulers update once per epoch based on validation loss;
+        # per-iteration schedulers have already been stepped inside the epoch.
+        if per_iter_scheduler is None:
+            scheduler.step(val_loss)
+            if current_lr != get_learning_rate(optimizer):
+                print('Loading best model weights!')
+                model.load_state_dict(best_model_wts)
 
         print("train loss: {:.6f}, val loss: {:.6f}, accuracy: {:.2f}".format(train_loss, val_loss, 100*val_accuracy))
         print("-" * 60)
@@ -116,16 +137,18 @@ def batch_correct_preds(output, target):
     correct_preds = pred.eq(target.view_as(pred)).sum().item()
     return correct_preds
 
-def get_batch_loss(criterion, output, target, optimizer=None):
+def get_batch_loss(criterion, output, target, optimizer=None, scaler=None):
     """
     Compute the loss for a mini-batch and perform backpropagation (if optimizer is provided).
-    
+
     Args:
         criterion (callable): Loss function.
         output (torch.Tensor): Model outputs for the mini-batch.
         target (torch.Tensor): True labels for the mini-batch.
         optimizer (torch.optim.Optimizer, optional): Optimizer to update model weights. If None, no backpropagation is performed.
-    
+        scaler (torch.cuda.amp.GradScaler, optional): Gradient scaler for fp16
+            mixed-precision training. Ignored when disabled or not provided.
+
     Returns:
         tuple: (loss_value, n_batch_correct_preds)
             - loss_value (float): Loss value for the mini-batch.
@@ -136,12 +159,18 @@ def get_batch_loss(criterion, output, target, optimizer=None):
     with torch.no_grad():
         n_batch_correct_preds = batch_correct_preds(output, target.long())
     if optimizer:
-        optimizer.zero_grad()
-        loss.backward()
-        optimizer.step()
+        # set_to_none frees the gradient tensors instead of zero-filling them
+        optimizer.zero_grad(set_to_none=True)
+        if scaler is not None and scaler.is_enabled():
+            scaler.scale(loss).backward()
+            scaler.step(optimizer)
+            scaler.update()
+        else:
+            loss.backward()
+            optimizer.step()
     return loss.item(), n_batch_correct_preds
 
-def get_epoch_loss(model, criterion, dataloader, device, optimizer=None):
+def get_epoch_loss(model, criterion, dataloader, device, optimizer=None, amp_dtype=None, scaler=None, scheduler=None):
     """
     Compute the average loss and overall accuracy for an epoch.
 
@@ -154,6 +183,10 @@ def get_epoch_loss(model, criterion, dataloader, device, optimizer=None):
         dataloader (torch.utils.data.DataLoader): DataLoader for the dataset.
         device (torch.device): Device (CPU or GPU) on which to perform computations.
         optimizer (torch.optim.Optimizer, optional): If provided, used to update model weights during training.
+        amp_dtype (torch.dtype, optional): Autocast dtype for the forward pass; None disables autocast.
+        scaler (torch.cuda.amp.GradScaler, optional): Gradient scaler for fp16 training.
+        scheduler (torch.optim.lr_scheduler, optional): Per-iteration scheduler,
+            stepped after each optimizer update.
 
     Returns:
         tuple: (loss, accuracy)
@@ -166,8 +199,18 @@ def get_epoch_loss(model, criterion, dataloader, device, optimizer=None):
     for x_batch, y_batch in tqdm(dataloader):
         # x_batch, y_batch = x_batch.to(device), y_batch.to(device)
         x_batch, y_batch = x_batch.to(device), y_batch.to(device).long()
-        output = model(x_batch)
-        batch_loss, n_batch_correct_preds = get_batch_loss(criterion, output, y_batch, optimizer)
+        if amp_dtype is not None:
+            with torch.autocast(device.type, dtype=amp_dtype):
+                output = model(x_batch)
+            # Upcast the logits so the cross-entropy runs in fp32, matching
+            # autocast's own promotion of loss ops; summed half-precision
+            # losses lose precision and can overflow in fp16.
+            output = output.float()
+        else:
+            output = model(x_batch)
+        batch_loss, n_batch_correct_preds = get_batch_loss(criterion, output, y_batch, optimizer, scaler)
+        if optimizer and scheduler is not None:
+            scheduler.step()
 
         running_loss += batch_loss
         running_total_correct_preds += n_batch_correct_preds
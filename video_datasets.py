@@ -10,7 +10,7 @@ using stratified sampling, and custom collate functions for handling variable-le
 
 import torch
 from torch.utils.data import Dataset
-from torchvision import transforms as transforms
+from torchvision.transforms.v2 import functional as F
 from torch.nn.utils.rnn import pad_sequence
 
 from PIL import Image
@@ -24,10 +24,12 @@ from sklearn.model_selection import StratifiedShuffleSplit
 
 class VideoDataset(Dataset):
     """
-    PyTorch Dataset class for loading video data from directories of frame images.
-    
-    Each video is represented as a directory containing JPEG images of its frames.
-    The dataset is provided as a dictionary mapping each video directory path to its label.
+    PyTorch Dataset class for loading video data from preprocessed clips.
+
+    Each video is represented either as a single .npy file holding a
+    (T, H, W, 3) uint8 tensor of its sampled frames, or (legacy layout) as a
+    directory containing JPEG images of its frames.
+    The dataset is provided as a dictionary mapping each video path to its label.
     
     Args:
         vid_dataset (dict): Dictionary where keys are video directory paths and values are integer labels.
@@ -55,24 +57,29 @@ class VideoDataset(Dataset):
             tuple: (frames_tensor, label) where frames_tensor is a tensor of shape (T, C, H, W)
                    with T being the number of frames (up to fr_per_vid) and label is an integer.
         """
-        # Get all JPEG frame paths from the video directory and select up to fr_per_vid frames
-        fr_paths = glob.glob(self.dataset[idx][0] + '/*.jpg')
-        fr_paths = fr_paths[:self.fpv]
-        
-        # Open images using PIL
-        fr_imgs = [Image.open(fr_path) for fr_path in fr_paths]
-        
+        vid_path = self.dataset[idx][0]
+        if vid_path.endswith('.npy'):
+            # Clip stored as a single (T, H, W, 3) uint8 tensor: one sequential
+            # read through the page cache, no per-frame JPEG decode.
+            clip = np.load(vid_path, mmap_mode='r')[:self.fpv]
+            fr_imgs = torch.from_numpy(np.ascontiguousarray(clip)).permute(0, 3, 1, 2)
+        else:
+            # Legacy layout: a directory of per-frame JPEG images
+            fr_paths = glob.glob(vid_path + '/*.jpg')
+            fr_paths = fr_paths[:self.fpv]
+            fr_tensors = [F.pil_to_tensor(Image.open(fr_path)) for fr_path in fr_paths]
+            fr_imgs = torch.stack(fr_tensors) if fr_tensors else torch.empty(0)
+
         # Get the label associated with the video
         fr_label = self.dataset[idx][1]
-        
-        # Apply transforms to each frame if provided, else keep original images
-        fr_imgs_trans = [self.transforms(fr_img) for fr_img in fr_imgs] if self.transforms else fr_imgs
 
-        # Stack transformed images into a tensor if available
-        if len(fr_imgs_trans) > 0:
-            fr_imgs_trans = torch.stack(fr_imgs_trans)
+        # Apply the v2 transforms to the whole uint8 clip in one call:
+        # augmentation parameters are shared across frames and the
+        # to-float + normalize pass is vectorized over the clip.
+        if self.transforms and len(fr_imgs) > 0:
+            fr_imgs = self.transforms(fr_imgs)
 
-        return fr_imgs_trans, fr_label
+        return fr_imgs, fr_label
 
 
 def load_dataset(frame_dir):
@@ -94,11 +101,12 @@ def load_dataset(frame_dir):
     label_dict = {vid_cat: idx for idx, vid_cat in enumerate(sorted(os.listdir(frame_dir)))}
     vid_dataset = {}
     print('Loading video dataset....')
-    for vid_cat in tqdm(sorted(os.listdir(frame_dir))):
+    for vid_cat in tqdm(sorted(label_dict)):
         vid_cat_path = os.path.join(frame_dir, vid_cat)
-        for vid in os.listdir(vid_cat_path):
-            vid_path = os.path.join(vid_cat_path, vid)
-            vid_dataset[vid_path] = label_dict[vid_cat]
+        # scandir returns DirEntry objects with the full path already built
+        with os.scandir(vid_cat_path) as it:
+            for vid_entry in it:
+                vid_dataset[vid_entry.path] = label_dict[vid_cat]
     return vid_dataset, label_dict
 
 